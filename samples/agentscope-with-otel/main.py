@@ -8,7 +8,7 @@ AgentScope + OpenTelemetry: 관찰 가능한 에이전트 시스템
 - 병목, 에러, 의존관계가 Jaeger UI에서 즉시 확인된다
 
 실행 방법:
-  1. Jaeger 실행: docker run -d -p 16686:16686 -p 4317:4317 jaegertracing/all-in-one:latest
+  1. Jaeger 실행: docker run -d -p 16686:16686 -p 4317:4317 -p 4318:4318 jaegertracing/all-in-one:latest
   2. 샘플 실행: python main.py
   3. Jaeger UI 확인: http://localhost:16686
 
@@ -16,14 +16,17 @@ AgentScope + OpenTelemetry: 관찰 가능한 에이전트 시스템
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
-from contextlib import contextmanager
+from collections import deque
+from typing import Optional, List, Dict, Set, Any
+from contextlib import contextmanager, nullcontext
+from types import MappingProxyType
+from functools import lru_cache
+import asyncio
 import json
-import uuid
 import time
 import random
 import sys
+import os
 
 # ============================================================
 # OpenTelemetry 설정 - Jaeger 연동
@@ -34,12 +37,14 @@ OTEL_AVAILABLE = False
 try:
     from opentelemetry import trace
     from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
     from opentelemetry.sdk.trace.export import BatchSpanProcessor
     from opentelemetry.sdk.resources import Resource, SERVICE_NAME
     from opentelemetry.trace import Status, StatusCode
 
     # OTLP Exporter (Jaeger, Tempo, 등 모든 OTLP 호환 백엔드와 연동)
-    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    # 기본은 HTTP/protobuf - 세션(커넥션 풀)을 재사용해 배치마다 연결을 맺지 않는다
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
 
     OTEL_AVAILABLE = True
 
@@ -56,32 +61,112 @@ except ImportError as e:
     sys.exit(1)
 
 
+def _env_int(name: str, default: int) -> int:
+    """환경 변수에서 정수 설정값을 읽는다 (없으면 기본값)"""
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """환경 변수에서 실수 설정값을 읽는다 (없으면 기본값)"""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# 샘플링 비율이 0이면 span 객체와 attributes dict 자체를 만들지 않는다.
+# NoopTracer/비샘플링 span도 생성 비용은 그대로 들기 때문이다.
+_SAMPLING_ON = True
+_NO_SPAN = nullcontext(trace.INVALID_SPAN)
+
+
+OTLP_HTTP_ENDPOINT = "http://localhost:4318/v1/traces"
+OTLP_GRPC_ENDPOINT = "http://localhost:4317"
+
+
+def _create_otlp_exporter(endpoint: Optional[str] = None):
+    """
+    OTLP Exporter 생성
+
+    OTEL_EXPORTER_OTLP_PROTOCOL=grpc 이면 gRPC exporter를,
+    그 외에는 HTTP/protobuf exporter를 사용한다.
+    exporter는 setup_tracing에서 한 번만 만들어지므로
+    내부 HTTP 세션이 모든 배치 전송에 재사용된다.
+    """
+    protocol = os.environ.get("OTEL_EXPORTER_OTLP_PROTOCOL", "http/protobuf")
+
+    if protocol == "grpc":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+            OTLPSpanExporter as GrpcOTLPSpanExporter,
+        )
+        return GrpcOTLPSpanExporter(
+            endpoint=endpoint or OTLP_GRPC_ENDPOINT,
+            insecure=True  # 로컬 개발용
+        )
+
+    return OTLPSpanExporter(endpoint=endpoint or OTLP_HTTP_ENDPOINT)
+
+
 def setup_tracing(service_name: str = "travel-planning-agents",
-                  jaeger_endpoint: str = "http://localhost:4317"):
+                  jaeger_endpoint: Optional[str] = None,
+                  max_queue_size: Optional[int] = None,
+                  schedule_delay_millis: Optional[int] = None,
+                  max_export_batch_size: Optional[int] = None,
+                  export_timeout_millis: Optional[int] = None,
+                  sample_ratio: Optional[float] = None):
     """
     OpenTelemetry 트레이싱 설정
 
     이 함수 하나로 Jaeger 연동이 완료된다.
     무료 오픈소스만으로 프로덕션 레벨 관찰이 가능해진다.
+
+    BatchSpanProcessor 튜닝값은 인자 → OTEL_BSP_* 환경 변수 → 기본값 순으로 결정된다.
+    코드 수정 없이 환경 변수만으로 재조정할 수 있다.
+    샘플링 비율도 같은 방식으로 OTEL_TRACES_SAMPLER_ARG에서 읽는다 (기본 1.0).
     """
+    global _SAMPLING_ON
+
+    if max_queue_size is None:
+        max_queue_size = _env_int("OTEL_BSP_MAX_QUEUE_SIZE", 4096)
+    if schedule_delay_millis is None:
+        schedule_delay_millis = _env_int("OTEL_BSP_SCHEDULE_DELAY", 1000)
+    if max_export_batch_size is None:
+        max_export_batch_size = _env_int("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", 256)
+    if export_timeout_millis is None:
+        export_timeout_millis = _env_int("OTEL_BSP_EXPORT_TIMEOUT", 10000)
+    if sample_ratio is None:
+        sample_ratio = _env_float("OTEL_TRACES_SAMPLER_ARG", 1.0)
+    _SAMPLING_ON = sample_ratio > 0
+
     # 서비스 리소스 정의
+    # 고정값 속성은 span마다 붙이지 않고 Resource에 한 번만 둔다 (배치당 한 번 직렬화)
     resource = Resource.create({
         SERVICE_NAME: service_name,
         "service.version": "1.0.0",
-        "deployment.environment": "demo"
+        "deployment.environment": "demo",
+        "db.system": "postgresql",
+        "db.name": "places",
     })
 
-    # Tracer Provider 생성
-    provider = TracerProvider(resource=resource)
+    # Tracer Provider 생성 - 루트에서 샘플링을 결정하고 자식 span은 따라간다
+    provider = TracerProvider(
+        resource=resource,
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio))
+    )
 
     # OTLP Exporter 설정 (Jaeger로 전송)
-    otlp_exporter = OTLPSpanExporter(
-        endpoint=jaeger_endpoint,
-        insecure=True  # 로컬 개발용
-    )
+    otlp_exporter = _create_otlp_exporter(jaeger_endpoint)
 
     # BatchSpanProcessor로 효율적인 전송
-    provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
+    # - 큰 큐: 메시지 fan-out 시 burst로 인한 span 유실 방지
+    # - 짧은 지연: Jaeger UI에 trace가 빨리 나타남
+    # - 작은 배치: 요청 크기 제한(gRPC 기본 4MB) 이내 유지
+    provider.add_span_processor(BatchSpanProcessor(
+        otlp_exporter,
+        max_queue_size=max_queue_size,
+        schedule_delay_millis=schedule_delay_millis,
+        max_export_batch_size=max_export_batch_size,
+        export_timeout_millis=export_timeout_millis,
+    ))
 
     # 글로벌 Tracer Provider 설정
     trace.set_tracer_provider(provider)
@@ -93,15 +178,67 @@ def setup_tracing(service_name: str = "travel-planning-agents",
 # 메시지 시스템 (AgentScope 원본 유지)
 # ============================================================
 
-@dataclass
+# 로컬 시간대 오프셋 (초) - 15분 구간마다 한 번 다시 구해 서머타임 전환을 따라간다
+# (전환 시각은 로컬 정각이지만 +9:30, +5:45 같은 시간대에서는 UTC 기준 15분 단위다)
+_utc_offset_s = 0
+_utc_offset_slot = None
+
+
+def _local_offset(s: int) -> int:
+    global _utc_offset_s, _utc_offset_slot
+    slot = s // 900
+    if slot != _utc_offset_slot:
+        _utc_offset_s = time.localtime(s).tm_gmtoff
+        _utc_offset_slot = slot
+    return _utc_offset_s
+
+
+def _fmt_ts(t_ns: int) -> str:
+    """
+    time.time_ns() 값을 "HH:MM:SS.mmm" 로컬 시각 문자열로 변환
+
+    datetime 객체 생성과 strftime 없이 정수 연산만 사용한다.
+    (표시용 값이다 - 정확한 시간은 span의 start_time에 있다)
+    """
+    s, ns = divmod(t_ns, 1_000_000_000)
+    hh, rem = divmod((s + _local_offset(s)) % 86400, 3600)
+    mm, ss = divmod(rem, 60)
+    return f"{hh:02d}:{mm:02d}:{ss:02d}.{ns // 1_000_000:03d}"
+
+
+_ID_BATCH = 4096
+_id_pool: List[str] = []
+
+
+def _new_msg_id() -> str:
+    """
+    8자리 hex 메시지 ID 발급
+
+    uuid4()를 메시지마다 만드는 대신 os.urandom으로 한 번에 4096개를 채워두고 꺼내 쓴다.
+    (list.pop은 GIL 하에서 원자적이다)
+    """
+    try:
+        return _id_pool.pop()
+    except IndexError:
+        raw = os.urandom(4 * _ID_BATCH).hex()
+        _id_pool.extend(raw[i:i + 8] for i in range(0, len(raw), 8))
+        return _id_pool.pop()
+
+
+@dataclass(slots=True)
 class Msg:
-    """메시지 객체"""
+    """메시지 객체 (slots: 인스턴스마다 __dict__를 만들지 않음)"""
     name: str
     content: Any
     role: str
     to: Optional[str] = None
-    id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
-    timestamp: str = field(default_factory=lambda: datetime.now().strftime("%H:%M:%S.%f")[:-3])
+    id: str = field(default_factory=_new_msg_id)
+    timestamp: str = field(default_factory=lambda: _fmt_ts(time.time_ns()))
+
+    def __post_init__(self):
+        # 반복되는 송신자/역할 문자열은 intern하여 span 속성에서 같은 객체를 재사용
+        self.name = sys.intern(self.name)
+        self.role = sys.intern(self.role)
 
     def get_text_content(self) -> str:
         if isinstance(self.content, str):
@@ -109,14 +246,24 @@ class Msg:
         return json.dumps(self.content, ensure_ascii=False, indent=2)
 
     def __str__(self) -> str:
+        # 헤더만 반환 - content 직렬화는 verbose()에서만 수행
         to_str = f" → {self.to}" if self.to else " → [ALL]"
         return f"[{self.timestamp}] [{self.id}] {self.name}{to_str}"
 
+    def verbose(self) -> str:
+        """헤더 + content 전체 (디버깅용, 명시적으로 호출할 때만 직렬화)"""
+        body = "\n".join(f"  │ {line}" for line in self.get_text_content().split("\n"))
+        return f"{self}\n{body}"
+
 
 # ============================================================
 # 계측된 메시지 버스 - OTel Span 자동 생성
 # ============================================================
 
+# 메시지 출력 구분선
+_SEPARATOR = "\n" + "─" * 60
+
+
 class TracedMessageBus:
     """
     OpenTelemetry로 계측된 메시지 버스
@@ -125,60 +272,93 @@ class TracedMessageBus:
     Jaeger UI에서 시각화된다.
     """
 
-    def __init__(self, tracer, debug: bool = True):
+    def __init__(self, tracer, debug: bool = True, verbose: bool = False):
         self.tracer = tracer
         self.messages: List[Msg] = []
+        self._seen_ids: Set[int] = set()  # messages 중복 저장 방지 (객체 id, O(1) 확인)
+        self._span_names: Dict[tuple, str] = {}  # (송신자, 수신자) → span 이름 캐시
         self.agents: Dict[str, 'TracedAgent'] = {}
+        self._broadcast_targets: Dict[str, List['TracedAgent']] = {}  # 송신자 → 브로드캐스트 수신자
         self.debug = debug
+        self.verbose = verbose  # debug 출력에 content까지 포함 (직렬화 비용이 있어 기본은 끔)
 
     def register(self, agent: 'TracedAgent'):
         self.agents[agent.name] = agent
+        agent._tracer = self.tracer
+        # 등록은 드물고 전송은 잦다 - 송신자별 수신자 목록을 미리 만들어 둔다
+        self._broadcast_targets = {
+            sender: [a for name, a in self.agents.items() if name != sender]
+            for sender in self.agents
+        }
         if self.debug:
             print(f"  📡 Agent registered: {agent.name}")
 
-    def send(self, msg: Msg, already_printed: bool = False) -> List[Msg]:
-        """메시지 전송 - 자동으로 Span 생성"""
+    def _print(self, msg: Msg):
+        print(_SEPARATOR)
+        print(msg.verbose() if self.verbose else msg)
+
+    def _store(self, msg: Msg):
+        """
+        메시지를 한 번만 기록 (객체 동일성 기준)
 
-        if msg not in self.messages:
+        msg.id는 32비트 표시용 값이라 충돌할 수 있으므로 쓰지 않는다.
+        기록된 메시지는 messages가 붙잡고 있어 id(msg)가 재사용되지 않는다.
+        """
+        key = id(msg)
+        if key not in self._seen_ids:
+            self._seen_ids.add(key)
             self.messages.append(msg)
 
+    async def send(self, msg: Msg, already_printed: bool = False) -> List[Msg]:
+        """메시지 전송 - 자동으로 Span 생성"""
+
+        self._store(msg)
+
         # 이미 출력된 메시지는 다시 출력하지 않음
         if self.debug and not already_printed:
-            print(f"\n{'─' * 60}")
-            print(msg)
+            self._print(msg)
 
         responses = []
-        target = msg.to if msg.to else "broadcast"
 
-        # 메시지 전송을 Span으로 기록
-        with self.tracer.start_as_current_span(
-            f"message: {msg.name} → {target}",
-            attributes={
-                "message.id": msg.id,
-                "message.from": msg.name,
-                "message.to": target,
-                "message.role": msg.role,
-            }
-        ) as span:
+        # 메시지 전송을 Span으로 기록 (샘플링이 꺼져 있으면 span을 만들지 않음)
+        if _SAMPLING_ON:
+            target = msg.to if msg.to else "broadcast"
+            span_name = self._span_names.get((msg.name, target))
+            if span_name is None:
+                span_name = self._span_names[(msg.name, target)] = f"message: {msg.name} → {target}"
+            span_cm = self.tracer.start_as_current_span(
+                span_name,
+                attributes={
+                    "message.id": msg.id,
+                    "message.from": msg.name,
+                    "message.to": target,
+                    "message.role": msg.role,
+                }
+            )
+        else:
+            span_cm = _NO_SPAN
+
+        with span_cm:
             if msg.to:
                 if msg.to in self.agents:
-                    response = self.agents[msg.to].receive(msg, self.tracer)
+                    response = await self.agents[msg.to].receive(msg)
                     if response:
                         responses.append(response)
-                        self.messages.append(response)
+                        self._store(response)
                         if self.debug:
-                            print(f"\n{'─' * 60}")
-                            print(response)
+                            self._print(response)
             else:
-                for name, agent in self.agents.items():
-                    if name != msg.name:
-                        response = agent.receive(msg, self.tracer)
-                        if response:
-                            responses.append(response)
-                            self.messages.append(response)
-                            if self.debug:
-                                print(f"\n{'─' * 60}")
-                                print(response)
+                targets = self._broadcast_targets.get(msg.name)
+                if targets is None:
+                    # 등록되지 않은 송신자(예: User)는 모든 에이전트에게 전달
+                    targets = self.agents.values()
+                for agent in targets:
+                    response = await agent.receive(msg)
+                    if response:
+                        responses.append(response)
+                        self._store(response)
+                        if self.debug:
+                            self._print(response)
 
         return responses
 
@@ -190,25 +370,38 @@ class TracedMessageBus:
 class TracedAgent:
     """OpenTelemetry로 계측된 에이전트"""
 
+    __slots__ = ("name", "system_prompt", "memory", "_span_name", "_static_attrs", "_handlers", "_tracer")
+
     def __init__(self, name: str, system_prompt: str = ""):
-        self.name = name
+        self.name = sys.intern(name)
         self.system_prompt = system_prompt
         self.memory: List[Msg] = []
 
-    def receive(self, msg: Msg, tracer) -> Optional[Msg]:
+        # span 이름과 고정 속성은 에이전트마다 한 번만 만든다
+        self._span_name = f"agent.{self.name}.process"
+        self._static_attrs = MappingProxyType({
+            "agent.name": self.name,
+            "agent.type": sys.intern(type(self).__name__),
+        })
+
+        # (송신자, action) → 처리 메서드. 서브클래스가 __init__에서 채운다
+        self._handlers: Dict[tuple, Any] = {}
+
+        # 버스에 등록될 때 버스의 tracer를 공유받는다 (호출마다 인자로 넘기지 않음)
+        self._tracer = None
+
+    async def receive(self, msg: Msg) -> Optional[Msg]:
         self.memory.append(msg)
 
         # 에이전트 처리를 Span으로 기록
-        with tracer.start_as_current_span(
-            f"agent.{self.name}.process",
-            attributes={
-                "agent.name": self.name,
-                "agent.type": self.__class__.__name__,
-                "input.message_id": msg.id,
-            }
-        ) as span:
+        span_cm = self._tracer.start_as_current_span(
+            self._span_name,
+            attributes={**self._static_attrs, "input.message_id": msg.id}
+        ) if _SAMPLING_ON else _NO_SPAN
+
+        with span_cm as span:
             try:
-                result = self._process(msg, tracer)
+                result = await self._process(msg)
                 if result:
                     span.set_attribute("output.message_id", result.id)
                 return result
@@ -217,8 +410,13 @@ class TracedAgent:
                 span.record_exception(e)
                 raise
 
-    def _process(self, msg: Msg, tracer) -> Optional[Msg]:
-        raise NotImplementedError
+    async def _process(self, msg: Msg) -> Optional[Msg]:
+        """(송신자, action) 한 번의 dict 조회로 처리 메서드를 찾는다"""
+        action = msg.content.get("action") if isinstance(msg.content, dict) else None
+        handler = self._handlers.get((msg.name, action))
+        if handler is None:
+            return None
+        return await handler(msg)
 
 
 # ============================================================
@@ -228,42 +426,49 @@ class TracedAgent:
 class CoordinatorAgent(TracedAgent):
     """Coordinator: 전체 흐름 조율"""
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(name="Coordinator", system_prompt="여행 일정 생성을 조율하는 에이전트")
-
-    def _process(self, msg: Msg, tracer) -> Optional[Msg]:
-        if msg.role == "user":
-            return Msg(
-                name=self.name, role="assistant", to="PlaceExpert",
-                content={
-                    "action": "request_places",
-                    "requirements": {
-                        "destination": "부산", "duration": "1박 2일",
-                        "style": "혼자 여행",
-                        "preferences": ["조용한 카페", "전시"],
-                        "constraints": ["혼밥 가능", "이동 동선 최소화"]
-                    }
+        self._handlers = {
+            ("User", None): self._on_user_request,
+            ("PlaceExpert", "places_response"): self._on_places,
+            ("ScheduleExpert", "schedule_response"): self._on_schedule,
+        }
+
+    async def _on_user_request(self, msg: Msg) -> Msg:
+        return Msg(
+            name=self.name, role="assistant", to="PlaceExpert",
+            content={
+                "action": "request_places",
+                "requirements": {
+                    "destination": "부산", "duration": "1박 2일",
+                    "style": "혼자 여행",
+                    "preferences": ["조용한 카페", "전시"],
+                    "constraints": ["혼밥 가능", "이동 동선 최소화"]
                 }
-            )
-        elif msg.name == "PlaceExpert":
-            return Msg(
-                name=self.name, role="assistant", to="ScheduleExpert",
-                content={
-                    "action": "create_schedule",
-                    "places": msg.content.get("places", []),
-                    "duration": "1박 2일"
-                }
-            )
-        elif msg.name == "ScheduleExpert":
-            return Msg(
-                name=self.name, role="assistant", to=None,
-                content={
-                    "action": "final_result",
-                    "schedule": msg.content.get("schedule", {}),
-                    "summary": "일정 생성이 완료되었습니다"
-                }
-            )
-        return None
+            }
+        )
+
+    async def _on_places(self, msg: Msg) -> Msg:
+        return Msg(
+            name=self.name, role="assistant", to="ScheduleExpert",
+            content={
+                "action": "create_schedule",
+                "places": msg.content.get("places", []),
+                "duration": "1박 2일"
+            }
+        )
+
+    async def _on_schedule(self, msg: Msg) -> Msg:
+        return Msg(
+            name=self.name, role="assistant", to=None,
+            content={
+                "action": "final_result",
+                "schedule": msg.content.get("schedule", {}),
+                "summary": "일정 생성이 완료되었습니다"
+            }
+        )
 
 
 class PlaceExpertAgent(TracedAgent):
@@ -274,6 +479,8 @@ class PlaceExpertAgent(TracedAgent):
     → Jaeger에서 이 병목이 명확히 보인다
     """
 
+    __slots__ = ("simulate_delay",)
+
     PLACES = {
         "cafe": [
             {"name": "모모스커피", "area": "전포동", "features": ["조용함", "혼자 작업 좋음"]},
@@ -291,40 +498,41 @@ class PlaceExpertAgent(TracedAgent):
     def __init__(self, simulate_delay: bool = True):
         super().__init__(name="PlaceExpert", system_prompt="부산 지역 장소 전문가")
         self.simulate_delay = simulate_delay
-
-    def _process(self, msg: Msg, tracer) -> Optional[Msg]:
-        if isinstance(msg.content, dict) and msg.content.get("action") == "request_places":
-
-            # 외부 DB 조회 시뮬레이션 - Jaeger에서 이 Span이 병목으로 보임
-            if self.simulate_delay:
-                with tracer.start_as_current_span(
-                    "external.place_database.query",
-                    attributes={
-                        "db.system": "postgresql",
-                        "db.name": "places",
-                        "db.operation": "SELECT",
-                        "db.statement": "SELECT * FROM places WHERE city = 'busan'"
-                    }
-                ) as db_span:
-                    delay = random.uniform(0.8, 1.2)  # 800ms ~ 1200ms
-                    time.sleep(delay)
-                    db_span.set_attribute("db.rows_affected", 5)
-
-            requirements = msg.content.get("requirements", {})
-            preferences = requirements.get("preferences", [])
-            recommended = []
-
-            if "조용한 카페" in preferences:
-                recommended.extend(self.PLACES["cafe"])
-            if "전시" in preferences:
-                recommended.extend(self.PLACES["exhibition"])
-            recommended.extend(self.PLACES["restaurant"])
-
-            return Msg(
-                name=self.name, role="assistant", to="Coordinator",
-                content={"action": "places_response", "places": recommended}
-            )
-        return None
+        self._handlers = {("Coordinator", "request_places"): self._on_request_places}
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _recommend(cls, preferences: tuple) -> tuple:
+        """선호도 조합별 추천 장소 (PLACES는 고정 데이터이므로 결과를 캐시)"""
+        recommended = []
+        if "조용한 카페" in preferences:
+            recommended.extend(cls.PLACES["cafe"])
+        if "전시" in preferences:
+            recommended.extend(cls.PLACES["exhibition"])
+        recommended.extend(cls.PLACES["restaurant"])
+        return tuple(recommended)
+
+    async def _on_request_places(self, msg: Msg) -> Msg:
+        # 외부 DB 조회 시뮬레이션 - Jaeger에서 이 Span이 병목으로 보임
+        if self.simulate_delay:
+            # db.system / db.name 같은 고정 속성은 Resource에 있다
+            db_span_cm = self._tracer.start_as_current_span(
+                "external.place_database.query"
+            ) if _SAMPLING_ON else _NO_SPAN
+
+            with db_span_cm as db_span:
+                delay = random.uniform(0.8, 1.2)  # 800ms ~ 1200ms
+                await asyncio.sleep(delay)  # 이벤트 루프 양보 - exporter 스레드가 GIL을 얻음
+                db_span.set_attribute("db.rows_affected", 5)
+
+        requirements = msg.content.get("requirements", {})
+        preferences = tuple(sorted(requirements.get("preferences", [])))
+        recommended = list(self._recommend(preferences))
+
+        return Msg(
+            name=self.name, role="assistant", to="Coordinator",
+            content={"action": "places_response", "places": recommended}
+        )
 
 
 class ScheduleExpertAgent(TracedAgent):
@@ -335,57 +543,64 @@ class ScheduleExpertAgent(TracedAgent):
     → Jaeger에서 에러 trace가 빨간색으로 표시됨
     """
 
+    __slots__ = ("failure_rate",)
+
     def __init__(self, failure_rate: float = 0.0):
         super().__init__(name="ScheduleExpert", system_prompt="여행 일정 구성 전문가")
         self.failure_rate = failure_rate
-
-    def _process(self, msg: Msg, tracer) -> Optional[Msg]:
-        if isinstance(msg.content, dict) and msg.content.get("action") == "create_schedule":
-
-            # 일정 최적화 작업
-            with tracer.start_as_current_span(
-                "optimization.route_calculation",
-                attributes={"algorithm": "tsp_greedy"}
-            ) as opt_span:
-                time.sleep(0.1)  # 최적화 시간
-
-                # 조건부 실패
-                if random.random() < self.failure_rate:
-                    raise Exception("Route optimization failed: timeout after 30s")
-
-                opt_span.set_attribute("optimization.iterations", 42)
-
-            places = msg.content.get("places", [])
-            schedule = {
-                "day1": {
-                    "theme": "전포동/수영 권역",
-                    "items": [
-                        {"time": "10:00", "place": "모모스커피", "area": "전포동", "reason": "조용한 카페에서 여행 시작"},
-                        {"time": "14:00", "place": "F1963", "area": "수영", "reason": "전시 관람 및 복합문화공간 탐방"},
-                        {"time": "18:00", "place": "밀양순대국", "area": "부전동", "reason": "현지 맛집에서 혼밥"}
-                    ]
-                },
-                "day2": {
-                    "theme": "해운대 권역",
-                    "items": [
-                        {"time": "09:00", "place": "테라로사", "area": "해운대", "reason": "바다 근처 카페에서 여유로운 아침"},
-                        {"time": "11:00", "place": "해운대 해변 산책", "area": "해운대", "reason": "체크아웃 후 가벼운 마무리"}
-                    ]
-                },
-                "optimization_notes": ["권역별 분리로 이동 시간 최소화", "혼자 여행에 적합한 장소만 선정"]
-            }
-
-            return Msg(
-                name=self.name, role="assistant", to="Coordinator",
-                content={"action": "schedule_response", "schedule": schedule, "total_places": len(places)}
-            )
-        return None
+        self._handlers = {("Coordinator", "create_schedule"): self._on_create_schedule}
+
+    async def _on_create_schedule(self, msg: Msg) -> Msg:
+        # 일정 최적화 작업
+        opt_span_cm = self._tracer.start_as_current_span(
+            "optimization.route_calculation",
+            attributes={"algorithm": "tsp_greedy"}
+        ) if _SAMPLING_ON else _NO_SPAN
+
+        with opt_span_cm as opt_span:
+            await asyncio.sleep(0.1)  # 최적화 시간
+
+            # 조건부 실패
+            if random.random() < self.failure_rate:
+                raise Exception("Route optimization failed: timeout after 30s")
+
+            opt_span.set_attribute("optimization.iterations", 42)
+
+        places = msg.content.get("places", [])
+        schedule = {
+            "day1": {
+                "theme": "전포동/수영 권역",
+                "items": [
+                    {"time": "10:00", "place": "모모스커피", "area": "전포동", "reason": "조용한 카페에서 여행 시작"},
+                    {"time": "14:00", "place": "F1963", "area": "수영", "reason": "전시 관람 및 복합문화공간 탐방"},
+                    {"time": "18:00", "place": "밀양순대국", "area": "부전동", "reason": "현지 맛집에서 혼밥"}
+                ]
+            },
+            "day2": {
+                "theme": "해운대 권역",
+                "items": [
+                    {"time": "09:00", "place": "테라로사", "area": "해운대", "reason": "바다 근처 카페에서 여유로운 아침"},
+                    {"time": "11:00", "place": "해운대 해변 산책", "area": "해운대", "reason": "체크아웃 후 가벼운 마무리"}
+                ]
+            },
+            "optimization_notes": ["권역별 분리로 이동 시간 최소화", "혼자 여행에 적합한 장소만 선정"]
+        }
+
+        return Msg(
+            name=self.name, role="assistant", to="Coordinator",
+            content={"action": "schedule_response", "schedule": schedule, "total_places": len(places)}
+        )
 
 
 # ============================================================
 # 관찰 가능한 여행 계획 시스템
 # ============================================================
 
+# 일정 출력 구분선
+_HEAVY_BAR50 = "━" * 50
+_BAR50 = "─" * 50
+
+
 class ObservableTravelPlanningSystem:
     """
     OpenTelemetry + Jaeger로 완전히 관찰 가능한 시스템
@@ -404,7 +619,8 @@ class ObservableTravelPlanningSystem:
         print("=" * 60)
 
         self.tracer = tracer
-        self.bus = TracedMessageBus(tracer, debug=True)
+        # MSG_VERBOSE=1이면 메시지 content도 함께 출력
+        self.bus = TracedMessageBus(tracer, debug=True, verbose=_env_int("MSG_VERBOSE", 0) > 0)
 
         self.coordinator = CoordinatorAgent()
         self.place_expert = PlaceExpertAgent(simulate_delay=simulate_delay)
@@ -416,7 +632,7 @@ class ObservableTravelPlanningSystem:
 
         print()
 
-    def run(self, user_request: str) -> str:
+    async def run(self, user_request: str) -> str:
         """
         시스템 실행
 
@@ -425,7 +641,7 @@ class ObservableTravelPlanningSystem:
         """
 
         # Root Span: 전체 요청을 하나의 Trace로
-        with self.tracer.start_as_current_span(
+        root_span_cm = self.tracer.start_as_current_span(
             "travel_planning.request",
             attributes={
                 "request.type": "travel_planning",
@@ -433,23 +649,23 @@ class ObservableTravelPlanningSystem:
                 "request.duration": "1박2일",
                 "user.type": "solo_traveler"
             }
-        ) as root_span:
+        ) if _SAMPLING_ON else _NO_SPAN
+
+        with root_span_cm as root_span:
 
             print("=" * 60)
             print("📨 메시지 흐름 시작")
             print("=" * 60)
 
             user_msg = Msg(name="User", role="user", to="Coordinator", content=user_request)
-            responses = self.bus.send(user_msg)
+            frontier = deque(await self.bus.send(user_msg))
 
-            while responses:
-                next_responses = []
-                for response in responses:
-                    if response.to:
-                        # response는 이미 출력됨
-                        new_responses = self.bus.send(response, already_printed=True)
-                        next_responses.extend(new_responses)
-                responses = next_responses
+            # 응답을 FIFO로 처리 (세대별 리스트를 매번 새로 만들지 않음)
+            while frontier:
+                response = frontier.popleft()
+                if response.to:
+                    # response는 이미 출력됨
+                    frontier.extend(await self.bus.send(response, already_printed=True))
 
             print("\n" + "=" * 60)
             print("📋 최종 결과")
@@ -459,8 +675,10 @@ class ObservableTravelPlanningSystem:
             print(final_output)
 
             # Trace에 결과 요약 추가
-            root_span.set_attribute("result.success", True)
-            root_span.set_attribute("result.total_messages", len(self.bus.messages))
+            root_span.set_attributes({
+                "result.success": True,
+                "result.total_messages": len(self.bus.messages),
+            })
 
             return final_output
 
@@ -473,20 +691,20 @@ class ObservableTravelPlanningSystem:
         return "일정 생성 실패"
 
     def _format_schedule(self, schedule: dict) -> str:
-        lines = ["", "━" * 50, "🗓️  부산 1박 2일 여행 일정", "━" * 50]
+        lines = ["", _HEAVY_BAR50, "🗓️  부산 1박 2일 여행 일정", _HEAVY_BAR50]
 
         for day_key in ["day1", "day2"]:
             if day_key in schedule:
                 day = schedule[day_key]
                 day_num = "Day 1" if day_key == "day1" else "Day 2"
-                lines.extend(["", f"📍 {day_num} ({day.get('theme', '')})", "─" * 50])
+                lines.extend(["", f"📍 {day_num} ({day.get('theme', '')})", _BAR50])
 
                 for item in day.get("items", []):
                     lines.append(f"  {item['time']} | {item['place']}")
                     lines.append(f"           📍 {item['area']}")
                     lines.append(f"           💭 {item['reason']}")
 
-        lines.extend(["", "━" * 50])
+        lines.extend(["", _HEAVY_BAR50])
         return "\n".join(lines)
 
 
@@ -509,6 +727,7 @@ def main():
     print("  docker run -d --name jaeger \\")
     print("    -p 16686:16686 \\")
     print("    -p 4317:4317 \\")
+    print("    -p 4318:4318 \\")
     print("    jaegertracing/all-in-one:latest")
     print()
     print("─" * 70)
@@ -519,10 +738,7 @@ def main():
 
     # OpenTelemetry 설정 - 이 한 줄로 Jaeger 연동 완료
     print("🔌 OpenTelemetry 초기화 중...")
-    tracer = setup_tracing(
-        service_name="travel-planning-agents",
-        jaeger_endpoint="http://localhost:4317"
-    )
+    tracer = setup_tracing(service_name="travel-planning-agents")
     print("✅ Jaeger 연동 완료")
     print()
 
@@ -539,7 +755,7 @@ def main():
         failure_rate=0.0      # 실패율 (0.3 = 30% 확률로 실패)
     )
 
-    result = system.run(user_request)
+    result = asyncio.run(system.run(user_request))
 
     # Jaeger UI 안내
     print()
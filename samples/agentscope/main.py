@@ -17,9 +17,30 @@ from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+from collections import deque
+import asyncio
+import hashlib
 import json
+import os
 import uuid
 
+# 선택: 의미 기반(semantic) plan cache - 없으면 정확 일치 캐시만 사용
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+# 출력 수준 - TRAVEL_VERBOSE=0이면 출력을 모두 건너뛴다 (배치 실행용)
+VERBOSE = int(os.environ.get("TRAVEL_VERBOSE", "1"))
+
+
+def _emit(*args):
+    """VERBOSE일 때만 print"""
+    if VERBOSE:
+        print(*args)
+
 
 # ============================================================
 # 메시지 시스템 - AgentScope의 핵심!
@@ -65,6 +86,10 @@ class Msg:
 # 메시지 버스 - 에이전트 간 통신 인프라
 # ============================================================
 
+# 메시지 출력 구분선
+_SEPARATOR = "\n" + "─" * 60
+
+
 class MessageBus:
     """
     에이전트 간 메시지를 라우팅하는 중앙 버스
@@ -84,7 +109,7 @@ class MessageBus:
         """에이전트를 버스에 등록"""
         self.agents[agent.name] = agent
         if self.debug:
-            print(f"  📡 Agent registered: {agent.name}")
+            _emit(f"  📡 Agent registered: {agent.name}")
 
     def send(self, msg: Msg, already_printed: bool = False) -> List[Msg]:
         """
@@ -92,40 +117,57 @@ class MessageBus:
 
         운영 관점: 모든 메시지 흐름이 추적 가능하다
         """
+        self._record(msg, already_printed)
+
+        responses = []
+        for agent in self._recipients(msg):
+            self._collect(agent.receive(msg), responses)
+        return responses
+
+    async def send_async(self, msg: Msg, already_printed: bool = False) -> List[Msg]:
+        """
+        send()의 비동기 버전
+
+        수신자가 여럿(브로드캐스트)이면 각 에이전트의 처리를 동시에 진행한다.
+        """
+        self._record(msg, already_printed)
+
+        responses = []
+        results = await asyncio.gather(*(agent.areceive(msg) for agent in self._recipients(msg)))
+        for response in results:
+            self._collect(response, responses)
+        return responses
+
+    def _record(self, msg: Msg, already_printed: bool):
         # 이미 저장된 메시지인지 확인
         if msg not in self.messages:
             self.messages.append(msg)
 
         # 이미 출력된 메시지가 아닌 경우에만 출력
         if self.debug and not already_printed:
-            print(f"\n{'─' * 60}")
-            print(msg)
+            _emit(_SEPARATOR)
+            _emit(msg)
 
-        responses = []
+    @staticmethod
+    def is_final_result(msg: Msg) -> bool:
+        return (msg.name == "Coordinator" and isinstance(msg.content, dict)
+                and msg.content.get("action") == "final_result")
 
+    def _recipients(self, msg: Msg) -> List['BaseAgent']:
         if msg.to:
             # 특정 에이전트에게 직접 전달
-            if msg.to in self.agents:
-                response = self.agents[msg.to].receive(msg)
-                if response:
-                    responses.append(response)
-                    self.messages.append(response)
-                    if self.debug:
-                        print(f"\n{'─' * 60}")
-                        print(response)
-        else:
-            # 브로드캐스트 (송신자 제외)
-            for name, agent in self.agents.items():
-                if name != msg.name:
-                    response = agent.receive(msg)
-                    if response:
-                        responses.append(response)
-                        self.messages.append(response)
-                        if self.debug:
-                            print(f"\n{'─' * 60}")
-                            print(response)
+            agent = self.agents.get(msg.to)
+            return [agent] if agent else []
+        # 브로드캐스트 (송신자 제외)
+        return [agent for name, agent in self.agents.items() if name != msg.name]
 
-        return responses
+    def _collect(self, response: Optional[Msg], responses: List[Msg]):
+        if response:
+            responses.append(response)
+            self.messages.append(response)
+            if self.debug:
+                _emit(_SEPARATOR)
+                _emit(response)
 
 
 # ============================================================
@@ -157,6 +199,15 @@ class BaseAgent:
         self.memory.append(msg)
         return self._process(msg)
 
+    async def areceive(self, msg: Msg) -> Optional[Msg]:
+        """
+        비동기 수신
+
+        LLM 호출처럼 I/O가 있는 에이전트는 이 메서드를 재정의한다.
+        Mock 에이전트는 동기 처리를 그대로 사용한다.
+        """
+        return self.receive(msg)
+
     def _process(self, msg: Msg) -> Optional[Msg]:
         """서브클래스에서 구현할 처리 로직"""
         raise NotImplementedError
@@ -378,6 +429,63 @@ class ScheduleExpertAgent(BaseAgent):
 # 시스템 실행 - 메시지 기반 오케스트레이션
 # ============================================================
 
+def _normalize_request(user_request: str) -> str:
+    """
+    캐시 키용 요청 정규화
+
+    공백/대소문자 차이를 없애고, 순서가 의미 없는 '-' 항목은 정렬한다.
+    """
+    lines = [line.strip().lower() for line in user_request.splitlines() if line.strip()]
+    header = [line for line in lines if not line.startswith("-")]
+    bullets = sorted(" ".join(line[1:].split()) for line in lines if line.startswith("-"))
+    return "\n".join([" ".join(line.split()) for line in header] + bullets)
+
+
+class _LeaderCancelled(Exception):
+    """run_async에서 같은 요청을 실행하던 쪽이 취소됨 (대기자가 다시 실행한다)"""
+
+
+def plan_cache_key(user_request: str) -> str:
+    """정규화된 요청의 blake2b 해시"""
+    return hashlib.blake2b(_normalize_request(user_request).encode(), digest_size=16).hexdigest()
+
+
+class SemanticPlanCache:
+    """
+    표현만 다른 같은 요청을 하나의 계획으로 모으는 캐시
+
+    예: "부산 1박 2일 혼자 여행" ≈ "혼자 부산 이틀 여행"
+    요청을 임베딩하여 코사인 유사도(정규화 벡터의 내적)가 threshold 이상이면 재사용한다.
+    """
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                 threshold: float = 0.92):
+        self.model = SentenceTransformer(model_name)
+        self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+        self.values: List[str] = []
+        self.threshold = threshold
+
+    def encode(self, user_request: str):
+        return self.model.encode([user_request], normalize_embeddings=True)
+
+    def search(self, vec) -> Optional[str]:
+        if not self.values:
+            return None
+        scores, ids = self.index.search(vec, 1)
+        if scores[0, 0] >= self.threshold:
+            return self.values[ids[0, 0]]
+        return None
+
+    def add(self, vec, final_output: str):
+        self.index.add(vec)
+        self.values.append(final_output)
+
+
+# 일정 출력 구분선
+_HEAVY_BAR50 = "━" * 50
+_BAR50 = "─" * 50
+
+
 class TravelPlanningSystem:
     """
     여행 일정 생성 시스템
@@ -388,13 +496,13 @@ class TravelPlanningSystem:
     - 모든 상호작용이 명시적인 메시지로 추적 가능하다
     """
 
-    def __init__(self):
-        print("=" * 60)
-        print("🔧 시스템 초기화")
-        print("=" * 60)
+    def __init__(self, semantic_cache: bool = False):
+        _emit("=" * 60)
+        _emit("🔧 시스템 초기화")
+        _emit("=" * 60)
 
         # 메시지 버스 생성
-        self.bus = MessageBus(debug=True)
+        self.bus = MessageBus(debug=bool(VERBOSE))
 
         # 에이전트 생성 및 등록
         self.coordinator = CoordinatorAgent()
@@ -405,7 +513,20 @@ class TravelPlanningSystem:
         self.bus.register(self.place_expert)
         self.bus.register(self.schedule_expert)
 
-        print()
+        # 같은 요청이면 전체 메시지 흐름을 다시 돌리지 않는다 (plan cache)
+        self._plan_cache: Dict[str, str] = {}
+        # 실행 중인 요청 (single-flight) - 같은 요청이 동시에 들어오면 한 번만 실행하고 결과를 나눈다
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # 표현만 다른 요청까지 재사용하려면 semantic cache를 켠다 (모델 로드 비용이 있어 선택)
+        self._semantic_cache: Optional[SemanticPlanCache] = None
+        if semantic_cache:
+            if SEMANTIC_CACHE_AVAILABLE:
+                self._semantic_cache = SemanticPlanCache()
+            else:
+                _emit("  Note: faiss / sentence-transformers가 없어 semantic cache를 끕니다.")
+
+        _emit()
 
     def run(self, user_request: str) -> str:
         """
@@ -419,59 +540,159 @@ class TravelPlanningSystem:
         5. ScheduleExpert → Coordinator (일정 응답)
         6. Coordinator → 최종 결과 브로드캐스트
         """
-        print("=" * 60)
-        print("📨 메시지 흐름 시작")
-        print("=" * 60)
+        key, vec, cached = self._lookup_cache(user_request)
+        if cached is not None:
+            return self._reuse_cached(cached)
 
         # Step 1: 사용자 요청 메시지 생성
-        user_msg = Msg(
+        user_msg = self._start(user_request)
+
+        # Step 2: Coordinator가 처리 시작
+        queue = deque(self.bus.send(user_msg))
+
+        # Step 3-6: 연쇄적인 메시지 전달 (BFS - 도착 순서대로 하나씩 처리)
+        # 최종 결과는 이 요청의 흐름에서 직접 잡는다 (버스 기록을 거꾸로 훑지 않음)
+        final_msg = None
+        while queue:
+            response = queue.popleft()
+            if MessageBus.is_final_result(response):
+                final_msg = response
+            if response.to:  # 특정 에이전트에게 전달
+                # response는 이미 출력됨, already_printed=True
+                queue.extend(self.bus.send(response, already_printed=True))
+
+        return self._finish(key, vec, final_msg)
+
+    async def run_async(self, user_request: str) -> str:
+        """
+        run()의 비동기 버전
+
+        같은 단계의 응답들을 asyncio.gather로 동시에 전달한다.
+        LLM 기반 에이전트라면 단계별 소요 시간이 합이 아니라 최댓값에 가까워진다.
+        (Mock 에이전트는 await할 I/O가 없으므로 지금은 겹쳐 실행되는 작업이 없다)
+        """
+        key = plan_cache_key(user_request)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: 기다리던 쪽 하나가 취소돼도 공유 future는 취소되지 않는다
+            try:
+                return self._reuse_cached(await asyncio.shield(inflight))
+            except _LeaderCancelled:
+                # 실행하던 쪽이 취소됨 - 이 요청이 (또는 먼저 깨어난 다른 대기자가) 다시 실행한다
+                return await self.run_async(user_request)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await self._run_async(user_request)
+        except asyncio.CancelledError:
+            # 공유 future를 취소하면 취소되지 않은 대기자에게 CancelledError가 퍼지므로
+            # 별도 예외로 알려 대기자가 작업을 이어받게 한다
+            if not fut.done():
+                fut.set_exception(_LeaderCancelled())
+                fut.exception()
+            raise
+        except Exception as exc:
+            if not fut.done():
+                fut.set_exception(exc)
+                fut.exception()  # 기다리는 쪽이 없어도 "never retrieved" 경고가 나지 않게 한다
+            raise
+        else:
+            if not fut.done():
+                fut.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _run_async(self, user_request: str) -> str:
+        key, vec, cached = self._lookup_cache(user_request)
+        if cached is not None:
+            return self._reuse_cached(cached)
+
+        user_msg = self._start(user_request)
+        responses = await self.bus.send_async(user_msg)
+
+        # 다른 요청과 버스를 공유하므로 이 요청의 최종 결과는 직접 추적한다
+        final_msg = None
+        while responses:
+            final_msg = next((r for r in responses if MessageBus.is_final_result(r)), final_msg)
+            batches = await asyncio.gather(*(
+                self.bus.send_async(response, already_printed=True)
+                for response in responses if response.to
+            ))
+            responses = [r for batch in batches for r in batch]
+
+        return self._finish(key, vec, final_msg)
+
+    async def run_batch_async(self, user_requests: List[str]) -> List[str]:
+        """여러 요청을 동시에 실행"""
+        return list(await asyncio.gather(*(self.run_async(r) for r in user_requests)))
+
+    def _lookup_cache(self, user_request: str):
+        """(캐시 키, 임베딩 벡터, 캐시된 결과 또는 None)"""
+        key = plan_cache_key(user_request)
+        if key in self._plan_cache:
+            return key, None, self._plan_cache[key]
+
+        vec = None
+        if self._semantic_cache is not None:
+            vec = self._semantic_cache.encode(user_request)
+            cached = self._semantic_cache.search(vec)
+            if cached is not None:
+                self._plan_cache[key] = cached
+                return key, vec, cached
+
+        return key, vec, None
+
+    def _start(self, user_request: str) -> Msg:
+        _emit("=" * 60)
+        _emit("📨 메시지 흐름 시작")
+        _emit("=" * 60)
+
+        return Msg(
             name="User",
             role="user",
             to="Coordinator",
             content=user_request
         )
 
-        # Step 2: Coordinator가 처리 시작
-        responses = self.bus.send(user_msg)
-
-        # Step 3-6: 연쇄적인 메시지 전달
-        while responses:
-            next_responses = []
-            for response in responses:
-                if response.to:  # 특정 에이전트에게 전달
-                    # response는 이미 출력됨, already_printed=True
-                    new_responses = self.bus.send(response, already_printed=True)
-                    next_responses.extend(new_responses)
-            responses = next_responses
-
+    def _finish(self, key: str, vec, final_msg: Optional[Msg]) -> str:
         # 최종 결과 포맷팅
-        print("\n" + "=" * 60)
-        print("📋 최종 결과")
-        print("=" * 60)
+        _emit("\n" + "=" * 60)
+        _emit("📋 최종 결과")
+        _emit("=" * 60)
 
-        final_output = self._format_final_output()
-        print(final_output)
+        final_output = self._format_final_output(final_msg)
+        _emit(final_output)
 
-        return final_output
+        # 실패("일정 생성 실패")는 캐시하지 않는다 - 다음 요청에서 다시 시도한다
+        if final_msg is None:
+            return final_output
 
-    def _format_final_output(self) -> str:
-        """마지막 메시지에서 일정 추출 및 포맷팅"""
+        self._plan_cache[key] = final_output
+        if vec is not None:
+            self._semantic_cache.add(vec, final_output)
+        return final_output
 
-        # 마지막 Coordinator 메시지 찾기
-        for msg in reversed(self.bus.messages):
-            if msg.name == "Coordinator" and isinstance(msg.content, dict):
-                if msg.content.get("action") == "final_result":
-                    schedule = msg.content.get("schedule", {})
-                    return self._format_schedule(schedule)
+    def _reuse_cached(self, final_output: str) -> str:
+        _emit("=" * 60)
+        _emit("📋 최종 결과 (캐시된 일정 재사용)")
+        _emit("=" * 60)
+        _emit(final_output)
+        return final_output
 
-        return "일정 생성 실패"
+    def _format_final_output(self, final_msg: Optional[Msg]) -> str:
+        """final_result 메시지에서 일정 추출 및 포맷팅"""
+        if final_msg is None:
+            return "일정 생성 실패"
+        return self._format_schedule(final_msg.content.get("schedule", {}))
 
     def _format_schedule(self, schedule: dict) -> str:
         lines = []
         lines.append("")
-        lines.append("━" * 50)
+        lines.append(_HEAVY_BAR50)
         lines.append("🗓️  부산 1박 2일 여행 일정")
-        lines.append("━" * 50)
+        lines.append(_HEAVY_BAR50)
 
         for day_key in ["day1", "day2"]:
             if day_key in schedule:
@@ -479,7 +700,7 @@ class TravelPlanningSystem:
                 day_num = "Day 1" if day_key == "day1" else "Day 2"
                 lines.append("")
                 lines.append(f"📍 {day_num} ({day.get('theme', '')})")
-                lines.append("─" * 50)
+                lines.append(_BAR50)
 
                 for item in day.get("items", []):
                     lines.append(f"  {item['time']} | {item['place']}")
@@ -487,12 +708,12 @@ class TravelPlanningSystem:
                     lines.append(f"           💭 {item['reason']}")
 
         lines.append("")
-        lines.append("━" * 50)
+        lines.append(_HEAVY_BAR50)
         lines.append("📝 구성 이유")
-        lines.append("─" * 50)
+        lines.append(_BAR50)
         for note in schedule.get("optimization_notes", []):
             lines.append(f"  • {note}")
-        lines.append("━" * 50)
+        lines.append(_HEAVY_BAR50)
 
         return "\n".join(lines)
 
@@ -502,20 +723,20 @@ class TravelPlanningSystem:
 # ============================================================
 
 def main():
-    print("=" * 60)
-    print("AgentScope 여행 일정 생성기")
-    print("=" * 60)
-    print()
-    print("이 샘플이 보여주는 것:")
-    print("  - 에이전트 간 상호작용이 메시지 단위로 이루어진다")
-    print("  - 실행 구조가 '스크립트'가 아닌 '시스템'처럼 동작한다")
-    print("  - 누가 누구에게 어떤 메시지를 보냈는지 추적 가능하다")
-    print()
-    print("에이전트 구성:")
-    print("  - Coordinator: 흐름 조율")
-    print("  - PlaceExpert: 장소 추천")
-    print("  - ScheduleExpert: 일정 구성")
-    print()
+    _emit("=" * 60)
+    _emit("AgentScope 여행 일정 생성기")
+    _emit("=" * 60)
+    _emit()
+    _emit("이 샘플이 보여주는 것:")
+    _emit("  - 에이전트 간 상호작용이 메시지 단위로 이루어진다")
+    _emit("  - 실행 구조가 '스크립트'가 아닌 '시스템'처럼 동작한다")
+    _emit("  - 누가 누구에게 어떤 메시지를 보냈는지 추적 가능하다")
+    _emit()
+    _emit("에이전트 구성:")
+    _emit("  - Coordinator: 흐름 조율")
+    _emit("  - PlaceExpert: 장소 추천")
+    _emit("  - ScheduleExpert: 일정 구성")
+    _emit()
 
     user_request = """부산 1박 2일 여행
 - 혼자 여행
@@ -0,0 +1,109 @@
+"""
+AgentScope 여행 일정 생성기 - 작업 큐 버전
+=========================================
+
+TravelPlanningSystem.run은 메시지 버스 상태를 쥔 채 한 프로세스에서 블로킹된다.
+이 모듈은 run을 Celery 작업으로 감싸 요청 처리를 워커로 넘긴다.
+
+- submit()은 큐에 넣고 task_id만 돌려준다 (API 쪽 지연 = 큐 삽입 시간)
+- 처리량은 워커 수만큼 늘어난다
+- 상태는 Redis 해시 task:{id} 에 저장된다 (status, result, cost, TTL 있음)
+
+실행:
+    celery -A tasks worker --loglevel=info
+"""
+
+from collections import OrderedDict
+import os
+import sys
+import time
+import uuid
+
+try:
+    import redis
+    from celery import Celery
+
+except ImportError:
+    print("=" * 60)
+    print("❌ Celery / Redis가 설치되지 않았습니다.")
+    print("=" * 60)
+    print()
+    print("다음 명령으로 설치하세요:")
+    print()
+    print("  pip install celery redis")
+    print()
+    sys.exit(1)
+
+from main import TravelPlanningSystem, plan_cache_key
+
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+TASK_TTL_S = int(os.environ.get("TRAVEL_TASK_TTL_S", "86400"))
+PLAN_CACHE_SIZE = int(os.environ.get("TRAVEL_PLAN_CACHE_SIZE", "1024"))
+
+app = Celery("travel_tasks", broker=REDIS_URL, backend=REDIS_URL)
+_redis = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+# 워커 프로세스 단위 plan cache (LRU, 크기 제한)
+_plan_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _plan(user_request: str) -> str:
+    key = plan_cache_key(user_request)
+    if key in _plan_cache:
+        _plan_cache.move_to_end(key)
+        return _plan_cache[key]
+
+    # 버스 기록과 에이전트 메모리가 작업 사이에 쌓이지 않도록 작업마다 새 시스템을 만든다
+    result = TravelPlanningSystem().run(user_request)
+
+    _plan_cache[key] = result
+    if len(_plan_cache) > PLAN_CACHE_SIZE:
+        _plan_cache.popitem(last=False)
+    return result
+
+
+def _status_key(task_id: str) -> str:
+    return f"task:{task_id}"
+
+
+def _set_status(task_id: str, **fields):
+    """task:{id} 해시 갱신 - 쓸 때마다 TTL을 다시 건다"""
+    key = _status_key(task_id)
+    pipe = _redis.pipeline()
+    pipe.hset(key, mapping=fields)
+    pipe.expire(key, TASK_TTL_S)
+    pipe.execute()
+
+
+@app.task(bind=True, max_retries=3)
+def run_travel_task(self, task_id: str, user_request: str) -> str:
+    """워커에서 여행 일정 생성"""
+    _set_status(task_id, status="running")
+
+    start = time.perf_counter()
+    try:
+        result = _plan(user_request)
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            _set_status(task_id, status="failed", result=str(exc))
+            raise
+        _set_status(task_id, status="retrying")
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+
+    # Mock 에이전트라 LLM 비용이 없으므로 처리 시간(초)을 비용으로 기록
+    _set_status(task_id, status="done", result=result, cost=f"{time.perf_counter() - start:.3f}")
+    return result
+
+
+def submit(user_request: str) -> str:
+    """요청을 큐에 넣고 task_id 반환"""
+    task_id = str(uuid.uuid4())
+    _set_status(task_id, status="queued")
+    run_travel_task.apply_async(args=(task_id, user_request), task_id=task_id)
+    return task_id
+
+
+def get_status(task_id: str) -> dict:
+    """task:{id} 해시 조회 (status, result, cost)"""
+    return _redis.hgetall(_status_key(task_id))
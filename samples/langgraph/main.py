@@ -11,29 +11,76 @@ LangGraph 여행 일정 생성기
        설계 가능한 프로그램으로 만들려는 시도다."
 """
 
-from typing import TypedDict, Literal, List, Dict, Any
+from typing import TypedDict, Literal, List, Dict, Any, Annotated
 from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
 import json
+import operator
+import os
+import sys
+import types
+
+# 출력 수준 - TRAVEL_VERBOSE=0이면 로그 생성과 출력을 모두 건너뛴다 (배치 실행용)
+VERBOSE = int(os.environ.get("TRAVEL_VERBOSE", "1"))
+
+
+def _emit(*args):
+    """VERBOSE일 때만 print"""
+    if VERBOSE:
+        print(*args)
+
+
+# 배치 모드 - TRAVEL_BATCH=1일 때만 NumPy(+Numba) 거리 정렬 커널을 쓴다
+# 기본 실행은 3개짜리 목록을 몇 번 정렬할 뿐이라 import/JIT 비용이 더 크다 (순수 Python 사용)
+BATCH = os.environ.get("TRAVEL_BATCH", "0") == "1"
+if BATCH:
+    try:
+        import numpy as np
+    except ImportError:
+        BATCH = False
+        _emit("Note: numpy가 설치되지 않아 TRAVEL_BATCH를 무시합니다.\n")
+
 
 # ============================================================
 # MOCK DATA - LLM 호출 대신 사용할 정적 데이터
 # ============================================================
 
+@dataclass(slots=True, frozen=True)
+class Place:
+    """
+    장소 하나 - 유형(type)을 미리 담아 두어 선택할 때 dict 병합이 필요 없다
+    (slots: dict보다 작고 속성 접근이 빠르다)
+    """
+    name: str
+    area: str
+    type: str  # "cafe" | "exhibition" | "restaurant" | "activity"
+    solo_friendly: bool = True
+    vibe: str = ""
+    duration: int = 0
+    style: str = ""  # 식당 형태 (예: "혼밥가능")
+
+    def __post_init__(self):
+        # 비교가 잦은 지역/유형 문자열은 intern해서 같은 객체를 공유한다
+        object.__setattr__(self, "area", sys.intern(self.area))
+        object.__setattr__(self, "type", sys.intern(self.type))
+
+
 BUSAN_PLACES = {
     "cafe": [
-        {"name": "모모스커피", "area": "전포동", "vibe": "조용함", "solo_friendly": True},
-        {"name": "블랙업커피", "area": "전포동", "vibe": "조용함", "solo_friendly": True},
-        {"name": "테라로사", "area": "해운대", "vibe": "넓음", "solo_friendly": True},
+        Place(name="모모스커피", area="전포동", type="cafe", vibe="조용함"),
+        Place(name="블랙업커피", area="전포동", type="cafe", vibe="조용함"),
+        Place(name="테라로사", area="해운대", type="cafe", vibe="넓음"),
     ],
     "exhibition": [
-        {"name": "부산시립미술관", "area": "해운대", "duration": 120, "solo_friendly": True},
-        {"name": "F1963", "area": "수영", "duration": 90, "solo_friendly": True},
-        {"name": "뮤지엄원", "area": "해운대", "duration": 60, "solo_friendly": True},
+        Place(name="부산시립미술관", area="해운대", type="exhibition", duration=120),
+        Place(name="F1963", area="수영", type="exhibition", duration=90),
+        Place(name="뮤지엄원", area="해운대", type="exhibition", duration=60),
     ],
     "restaurant": [
-        {"name": "본전돼지국밥", "area": "서면", "type": "혼밥가능", "solo_friendly": True},
-        {"name": "밀양순대국", "area": "부전동", "type": "혼밥가능", "solo_friendly": True},
-        {"name": "원조할매국밥", "area": "서면", "type": "혼밥가능", "solo_friendly": True},
+        Place(name="본전돼지국밥", area="서면", type="restaurant", style="혼밥가능"),
+        Place(name="밀양순대국", area="부전동", type="restaurant", style="혼밥가능"),
+        Place(name="원조할매국밥", area="서면", type="restaurant", style="혼밥가능"),
     ],
 }
 
@@ -46,12 +93,80 @@ AREA_DISTANCES = {
     ("부전동", "전포동"): 3,
 }
 
+# 양방향 키를 모두 담은 거리표 - 조회 한 번으로 끝난다
+_DIST = {
+    **{(b, a): minutes for (a, b), minutes in AREA_DISTANCES.items()},
+    **AREA_DISTANCES,
+}
+
 def get_distance(area1: str, area2: str) -> int:
     """두 지역 간 이동 시간(분) 반환"""
     if area1 == area2:
         return 0
-    key = (area1, area2) if (area1, area2) in AREA_DISTANCES else (area2, area1)
-    return AREA_DISTANCES.get(key, 20)
+    # 대부분 표에 있는 쌍이므로 .get 호출 대신 바로 인덱싱 (EAFP)
+    try:
+        return _DIST[area1, area2]
+    except KeyError:
+        return 20  # 거리 정보가 없는 지역 쌍
+
+
+if BATCH:
+    # 지역을 정수로 인코딩한 거리 행렬 - dict 조회 대신 배열 인덱싱
+    AREAS = sorted({area for pair in AREA_DISTANCES for area in pair}
+                   | {p.area for places in BUSAN_PLACES.values() for p in places})
+    AREA_IDX = {name: i for i, name in enumerate(AREAS)}
+
+    DIST = np.full((len(AREAS), len(AREAS)), 20, dtype=np.int32)
+    for (a, b), minutes in AREA_DISTANCES.items():
+        DIST[AREA_IDX[a], AREA_IDX[b]] = DIST[AREA_IDX[b], AREA_IDX[a]] = minutes
+    np.fill_diagonal(DIST, 0)
+
+    # BUSAN_PLACES를 평탄화한 병렬 배열 (SoA) - 유형 순서, 유형 안에서는 원래 순서
+    _FLAT = [p for places in BUSAN_PLACES.values() for p in places]
+    PLACES = {
+        "area_idx": np.array([AREA_IDX[p.area] for p in _FLAT], dtype=np.int16),
+        "type": np.array([p.type for p in _FLAT], dtype=object),
+    }
+    del _FLAT
+
+    # 유형별 행 번호 - 호출마다 object 배열 전체를 비교해 mask를 만들지 않는다
+    _TYPE_ROWS = {place_type: np.flatnonzero(PLACES["type"] == place_type) for place_type in BUSAN_PLACES}
+
+    def sort_by_dist(dist, target_idx, area_idxs):
+        """target_idx에서 가까운 순서의 인덱스 (sorted와 같은 안정 정렬)"""
+        return np.argsort(dist[target_idx, area_idxs], kind="mergesort")
+
+    # Numba가 있으면 JIT 컴파일 (배치 모드에서만 import한다)
+    # setup.py로 Cython 컴파일된 경우 sort_by_dist는 이미 네이티브 함수라 JIT 대상이 아니다
+    try:
+        from numba import njit
+    except ImportError:
+        njit = None
+    if njit is not None and isinstance(sort_by_dist, types.FunctionType):
+        sort_by_dist = njit(cache=True)(sort_by_dist)
+
+
+# BUSAN_PLACES / AREA_DISTANCES는 고정 데이터이므로 정렬 결과를 캐시한다
+@lru_cache(maxsize=None)
+def _sorted_by_distance(target_area: str, place_type: str) -> tuple:
+    """target_area에서 가까운 순서의 BUSAN_PLACES[place_type] 인덱스"""
+    if BATCH and target_area in AREA_IDX:
+        rows = _TYPE_ROWS.get(place_type)
+        if rows is None:
+            return ()
+        # 유형의 행은 원래 순서 그대로이므로 argsort 결과가 곧 BUSAN_PLACES 인덱스다
+        order = sort_by_dist(DIST, AREA_IDX[target_area], PLACES["area_idx"][rows])
+        return tuple(int(i) for i in order)
+
+    places = BUSAN_PLACES.get(place_type, [])
+    return tuple(sorted(range(len(places)), key=lambda i: get_distance(target_area, places[i].area)))
+
+
+@lru_cache(maxsize=None)
+def _sorted_by_name(place_type: str) -> tuple:
+    """이름 순서의 BUSAN_PLACES[place_type] 인덱스"""
+    places = BUSAN_PLACES.get(place_type, [])
+    return tuple(sorted(range(len(places)), key=lambda i: places[i].name))
 
 
 # ============================================================
@@ -77,7 +192,7 @@ class TravelState(TypedDict):
     priority: str  # "minimize_travel" | "maximize_variety"
 
     # 선택된 장소들
-    selected_places: List[Dict[str, Any]]
+    selected_places: List[Place]
 
     # 일정
     day1_schedule: List[Dict[str, Any]]
@@ -87,13 +202,24 @@ class TravelState(TypedDict):
     final_output: str
 
     # 실행 로그 (철학을 보여주기 위해)
-    execution_log: List[str]
+    # 노드는 자신의 로그 조각만 반환하고, reducer(operator.add)가 이어 붙인다
+    execution_log: Annotated[List[str], operator.add]
 
 
 # ============================================================
 # 노드(Node) 함수들 - 각각 하나의 처리 단계
 # ============================================================
 
+# 로그/출력 구분선 (노드마다 새로 만들지 않도록 모듈 상수로 둔다)
+_EQ_BAR60 = "=" * 60
+_DASH_BAR40 = "-" * 40
+
+
+def _new_log() -> List[str]:
+    """노드 로그 - VERBOSE=0이면 빈 리스트 (노드의 log.append는 모두 if VERBOSE로 감싼다)"""
+    return [_EQ_BAR60] if VERBOSE else []
+
+
 def parse_request(state: TravelState) -> dict:
     """
     [Node 1] 사용자 요청을 구조화된 데이터로 파싱
@@ -101,9 +227,10 @@ def parse_request(state: TravelState) -> dict:
     이 노드의 역할: 자연어 → 구조화된 데이터
     실제 시스템에서는 LLM이 이 작업을 수행
     """
-    log = ["=" * 60]
-    log.append("[Node: parse_request] 사용자 요청 파싱 중...")
-    log.append(f"  입력: {state['raw_request'][:50]}...")
+    log = _new_log()
+    if VERBOSE:
+        log.append("[Node: parse_request] 사용자 요청 파싱 중...")
+        log.append(f"  입력: {state['raw_request'][:50]}...")
 
     # Mock 파싱 결과
     parsed = {
@@ -113,11 +240,17 @@ def parse_request(state: TravelState) -> dict:
         "constraints": ["혼밥 가능", "이동 동선 최소화"],
     }
 
-    log.append(f"  파싱 결과: {json.dumps(parsed, ensure_ascii=False, indent=4)}")
+    if VERBOSE:
+        log.append(f"  파싱 결과: {json.dumps(parsed, ensure_ascii=False, indent=4)}")
+
+    if MUTATE:
+        state.update(parsed)
+        state["execution_log"] += log
+        return None
 
     return {
         **parsed,
-        "execution_log": state.get("execution_log", []) + log
+        "execution_log": log
     }
 
 
@@ -127,29 +260,40 @@ def analyze_preferences(state: TravelState) -> dict:
 
     이 노드의 역할: 선호도 → 필요한 장소 유형 + 우선순위
     """
-    log = ["=" * 60]
-    log.append("[Node: analyze_preferences] 선호도 분석 중...")
+    log = _new_log()
+    if VERBOSE:
+        log.append("[Node: analyze_preferences] 선호도 분석 중...")
 
     place_types = []
     if "조용한 카페" in state["preferences"]:
         place_types.append("cafe")
-        log.append("  → '조용한 카페' 선호 → cafe 유형 필요")
+        if VERBOSE:
+            log.append("  → '조용한 카페' 선호 → cafe 유형 필요")
     if "전시" in state["preferences"]:
         place_types.append("exhibition")
-        log.append("  → '전시' 선호 → exhibition 유형 필요")
+        if VERBOSE:
+            log.append("  → '전시' 선호 → exhibition 유형 필요")
 
     # 식사는 기본 추가
     place_types.append("restaurant")
-    log.append("  → 식사 장소 기본 추가 → restaurant 유형 필요")
+    if VERBOSE:
+        log.append("  → 식사 장소 기본 추가 → restaurant 유형 필요")
 
     # 우선순위 결정
     priority = "minimize_travel" if "이동 동선 최소화" in state["constraints"] else "maximize_variety"
-    log.append(f"  → 제약조건 분석 결과 우선순위: {priority}")
+    if VERBOSE:
+        log.append(f"  → 제약조건 분석 결과 우선순위: {priority}")
+
+    if MUTATE:
+        state["place_types_needed"] = place_types
+        state["priority"] = priority
+        state["execution_log"] += log
+        return None
 
     return {
         "place_types_needed": place_types,
         "priority": priority,
-        "execution_log": state.get("execution_log", []) + log
+        "execution_log": log
     }
 
 
@@ -159,42 +303,45 @@ def select_places_minimize_travel(state: TravelState) -> dict:
 
     조건부 분기: priority가 "minimize_travel"일 때 이 노드로 라우팅
     """
-    log = ["=" * 60]
-    log.append("[Node: select_places_minimize_travel] 이동 최소화 전략으로 장소 선택...")
-    log.append("  전략: 같은 지역 내 장소들을 우선 선택")
+    log = _new_log()
+    if VERBOSE:
+        log.append("[Node: select_places_minimize_travel] 이동 최소화 전략으로 장소 선택...")
+        log.append("  전략: 같은 지역 내 장소들을 우선 선택")
 
     selected = []
     target_area = "전포동"  # 이동 최소화를 위해 중심 지역 선택
-    log.append(f"  기준 지역: {target_area}")
+    if VERBOSE:
+        log.append(f"  기준 지역: {target_area}")
 
     for place_type in state["place_types_needed"]:
-        candidates = BUSAN_PLACES.get(place_type, [])
         # 같은 지역 우선, 없으면 가까운 지역
-        sorted_candidates = sorted(
-            candidates,
-            key=lambda p: get_distance(target_area, p["area"])
-        )
-        if sorted_candidates:
-            place = sorted_candidates[0]
-            selected.append({**place, "type": place_type})
-            log.append(f"  선택: {place['name']} ({place['area']}) - {place_type}")
+        order = _sorted_by_distance(target_area, place_type)
+        if order:
+            place = BUSAN_PLACES[place_type][order[0]]
+            selected.append(place)
+            if VERBOSE:
+                log.append(f"  선택: {place.name} ({place.area}) - {place_type}")
 
     # 1박 2일이므로 추가 장소 선택
+    chosen = {(p.type, p.name) for p in selected}  # 이미 선택된 장소 (O(1) 확인)
     for place_type in ["cafe", "exhibition"]:
-        candidates = [p for p in BUSAN_PLACES.get(place_type, [])
-                     if {**p, "type": place_type} not in selected]
-        sorted_candidates = sorted(
-            candidates,
-            key=lambda p: get_distance(target_area, p["area"])
-        )
-        if sorted_candidates:
-            place = sorted_candidates[0]
-            selected.append({**place, "type": place_type})
-            log.append(f"  추가 선택: {place['name']} ({place['area']}) - {place_type}")
+        places = BUSAN_PLACES.get(place_type, [])
+        place = next((places[i] for i in _sorted_by_distance(target_area, place_type)
+                      if (place_type, places[i].name) not in chosen), None)
+        if place:
+            selected.append(place)
+            chosen.add((place_type, place.name))
+            if VERBOSE:
+                log.append(f"  추가 선택: {place.name} ({place.area}) - {place_type}")
+
+    if MUTATE:
+        state["selected_places"] = selected
+        state["execution_log"] += log
+        return None
 
     return {
         "selected_places": selected,
-        "execution_log": state.get("execution_log", []) + log
+        "execution_log": log
     }
 
 
@@ -204,29 +351,34 @@ def select_places_maximize_variety(state: TravelState) -> dict:
 
     조건부 분기: priority가 "maximize_variety"일 때 이 노드로 라우팅
     """
-    log = ["=" * 60]
-    log.append("[Node: select_places_maximize_variety] 다양성 극대화 전략으로 장소 선택...")
-    log.append("  전략: 다양한 지역의 장소들을 선택")
+    log = _new_log()
+    if VERBOSE:
+        log.append("[Node: select_places_maximize_variety] 다양성 극대화 전략으로 장소 선택...")
+        log.append("  전략: 다양한 지역의 장소들을 선택")
 
     selected = []
     used_areas = set()
 
     for place_type in state["place_types_needed"]:
-        candidates = BUSAN_PLACES.get(place_type, [])
-        # 사용하지 않은 지역 우선
-        sorted_candidates = sorted(
-            candidates,
-            key=lambda p: (p["area"] in used_areas, p["name"])
-        )
-        if sorted_candidates:
-            place = sorted_candidates[0]
-            selected.append({**place, "type": place_type})
-            used_areas.add(place["area"])
-            log.append(f"  선택: {place['name']} ({place['area']}) - {place_type}")
+        places = BUSAN_PLACES.get(place_type, [])
+        order = _sorted_by_name(place_type)
+        # 사용하지 않은 지역 우선 (이름순), 모두 사용했으면 이름순 첫 번째
+        if order:
+            place = next((places[i] for i in order if places[i].area not in used_areas),
+                         places[order[0]])
+            selected.append(place)
+            used_areas.add(place.area)
+            if VERBOSE:
+                log.append(f"  선택: {place.name} ({place.area}) - {place_type}")
+
+    if MUTATE:
+        state["selected_places"] = selected
+        state["execution_log"] += log
+        return None
 
     return {
         "selected_places": selected,
-        "execution_log": state.get("execution_log", []) + log
+        "execution_log": log
     }
 
 
@@ -236,16 +388,19 @@ def generate_schedule(state: TravelState) -> dict:
 
     이 노드의 역할: 장소 목록 → 시간 순서가 있는 일정
     """
-    log = ["=" * 60]
-    log.append("[Node: generate_schedule] 일정 생성 중...")
+    log = _new_log()
+    if VERBOSE:
+        log.append("[Node: generate_schedule] 일정 생성 중...")
 
     places = state["selected_places"]
 
     # Day 1: 카페 → 전시 → 저녁
     day1 = []
-    cafes = [p for p in places if p["type"] == "cafe"]
-    exhibitions = [p for p in places if p["type"] == "exhibition"]
-    restaurants = [p for p in places if p["type"] == "restaurant"]
+    # 한 번 순회로 유형별 분류
+    by_type = {"cafe": [], "exhibition": [], "restaurant": []}
+    for p in places:
+        by_type.setdefault(p.type, []).append(p)
+    cafes, exhibitions, restaurants = by_type["cafe"], by_type["exhibition"], by_type["restaurant"]
 
     if cafes:
         day1.append({
@@ -253,7 +408,8 @@ def generate_schedule(state: TravelState) -> dict:
             "place": cafes[0],
             "reason": "여행 시작을 조용한 카페에서 여유롭게"
         })
-        log.append(f"  Day1 10:00 - {cafes[0]['name']}")
+        if VERBOSE:
+            log.append(f"  Day1 10:00 - {cafes[0].name}")
 
     if exhibitions:
         day1.append({
@@ -261,7 +417,8 @@ def generate_schedule(state: TravelState) -> dict:
             "place": exhibitions[0],
             "reason": "오후 시간 전시 관람으로 문화 충전"
         })
-        log.append(f"  Day1 14:00 - {exhibitions[0]['name']}")
+        if VERBOSE:
+            log.append(f"  Day1 14:00 - {exhibitions[0].name}")
 
     if restaurants:
         day1.append({
@@ -269,7 +426,8 @@ def generate_schedule(state: TravelState) -> dict:
             "place": restaurants[0],
             "reason": "현지 맛집에서 혼밥으로 하루 마무리"
         })
-        log.append(f"  Day1 18:00 - {restaurants[0]['name']}")
+        if VERBOSE:
+            log.append(f"  Day1 18:00 - {restaurants[0].name}")
 
     # Day 2: 나머지 장소들
     day2 = []
@@ -282,7 +440,8 @@ def generate_schedule(state: TravelState) -> dict:
             "place": remaining_cafes[0],
             "reason": "아침 커피와 함께 여유로운 시작"
         })
-        log.append(f"  Day2 09:00 - {remaining_cafes[0]['name']}")
+        if VERBOSE:
+            log.append(f"  Day2 09:00 - {remaining_cafes[0].name}")
 
     if remaining_exhibitions:
         day2.append({
@@ -290,20 +449,28 @@ def generate_schedule(state: TravelState) -> dict:
             "place": remaining_exhibitions[0],
             "reason": "체크아웃 후 가볍게 둘러보기"
         })
-        log.append(f"  Day2 11:00 - {remaining_exhibitions[0]['name']}")
+        if VERBOSE:
+            log.append(f"  Day2 11:00 - {remaining_exhibitions[0].name}")
     elif exhibitions:
         # 남은 전시가 없으면 다른 활동 제안
         day2.append({
             "time": "11:00",
-            "place": {"name": "광안리 산책", "area": "광안리"},
+            "place": Place(name="광안리 산책", area="광안리", type="activity"),
             "reason": "체크아웃 후 바다 산책으로 여행 마무리"
         })
-        log.append(f"  Day2 11:00 - 광안리 산책")
+        if VERBOSE:
+            log.append(f"  Day2 11:00 - 광안리 산책")
+
+    if MUTATE:
+        state["day1_schedule"] = day1
+        state["day2_schedule"] = day2
+        state["execution_log"] += log
+        return None
 
     return {
         "day1_schedule": day1,
         "day2_schedule": day2,
-        "execution_log": state.get("execution_log", []) + log
+        "execution_log": log
     }
 
 
@@ -313,51 +480,58 @@ def format_output(state: TravelState) -> dict:
 
     이 노드의 역할: 구조화된 일정 → 사람이 읽기 좋은 텍스트
     """
-    log = ["=" * 60]
-    log.append("[Node: format_output] 최종 출력 생성 중...")
+    log = _new_log()
+    if VERBOSE:
+        log.append("[Node: format_output] 최종 출력 생성 중...")
 
     output_lines = []
-    output_lines.append("=" * 60)
+    output_lines.append(_EQ_BAR60)
     output_lines.append("🗓️  부산 1박 2일 여행 일정")
-    output_lines.append("=" * 60)
+    output_lines.append(_EQ_BAR60)
     output_lines.append("")
 
     # Day 1
     output_lines.append("📍 Day 1")
-    output_lines.append("-" * 40)
+    output_lines.append(_DASH_BAR40)
     for item in state["day1_schedule"]:
         place = item["place"]
-        output_lines.append(f"  {item['time']} | {place['name']}")
-        output_lines.append(f"           📍 {place.get('area', '')}")
+        output_lines.append(f"  {item['time']} | {place.name}")
+        output_lines.append(f"           📍 {place.area}")
         output_lines.append(f"           💭 {item['reason']}")
         output_lines.append("")
 
     # Day 2
     output_lines.append("📍 Day 2")
-    output_lines.append("-" * 40)
+    output_lines.append(_DASH_BAR40)
     for item in state["day2_schedule"]:
         place = item["place"]
-        output_lines.append(f"  {item['time']} | {place['name']}")
-        output_lines.append(f"           📍 {place.get('area', '')}")
+        output_lines.append(f"  {item['time']} | {place.name}")
+        output_lines.append(f"           📍 {place.area}")
         output_lines.append(f"           💭 {item['reason']}")
         output_lines.append("")
 
     # 일정 구성 이유
-    output_lines.append("=" * 60)
+    output_lines.append(_EQ_BAR60)
     output_lines.append("📝 전체 구성 이유")
-    output_lines.append("-" * 40)
+    output_lines.append(_DASH_BAR40)
     output_lines.append("• 혼자 여행에 적합한 장소들로 구성")
     output_lines.append("• 조용한 카페와 전시 공간 위주")
     output_lines.append(f"• 이동 동선 최소화를 위해 {state['priority']} 전략 적용")
     output_lines.append("• 혼밥 가능한 식당 선정")
-    output_lines.append("=" * 60)
+    output_lines.append(_EQ_BAR60)
 
     final_output = "\n".join(output_lines)
-    log.append("  출력 생성 완료")
+    if VERBOSE:
+        log.append("  출력 생성 완료")
+
+    if MUTATE:
+        state["final_output"] = final_output
+        state["execution_log"] += log
+        return None
 
     return {
         "final_output": final_output,
-        "execution_log": state.get("execution_log", []) + log
+        "execution_log": log
     }
 
 
@@ -387,8 +561,12 @@ try:
     LANGGRAPH_AVAILABLE = True
 except ImportError:
     LANGGRAPH_AVAILABLE = False
-    print("Note: langgraph 패키지가 설치되지 않아 Mock 모드로 실행합니다.")
-    print("      철학을 보여주는 데모로 동작합니다.\n")
+    _emit("Note: langgraph 패키지가 설치되지 않아 Mock 모드로 실행합니다.")
+    _emit("      철학을 보여주는 데모로 동작합니다.\n")
+
+# Mock 그래프에서는 노드가 state를 직접 수정한다 (노드마다 업데이트 dict를 만들고 병합하지 않음)
+# 실제 LangGraph에서는 노드가 업데이트 dict를 반환해야 하므로 끈다
+MUTATE = not LANGGRAPH_AVAILABLE
 
 
 class MockCompiledGraph:
@@ -405,27 +583,48 @@ class MockCompiledGraph:
         self.edges = edges
         self.conditional_edges = conditional_edges
         self.entry_point = entry_point
+        self._entry_step = self._compile()
+
+    def _compile(self):
+        """
+        그래프 토폴로지는 고정이므로 한 번만 해석해 둔다
+
+        각 노드를 [노드 함수, 라우터, {route_key: 다음 step}, 다음 step]으로 바꾸고
+        step끼리 직접 연결한다. invoke는 이름 → dict 조회 없이 step을 따라가기만 한다.
+        """
+        names = set(self.nodes) | set(self.edges) | set(self.conditional_edges) | {self.entry_point}
+        steps = {name: [self.nodes.get(name), None, None, None] for name in names if name}
+
+        for name, step in steps.items():
+            if name in self.conditional_edges:
+                router_func, route_map = self.conditional_edges[name]
+                step[1] = router_func
+                step[2] = {key: steps.get(target) for key, target in route_map.items()}
+            elif name in self.edges:
+                step[3] = steps.get(self.edges[name])
+
+        return steps.get(self.entry_point)
 
     def invoke(self, initial_state: TravelState) -> TravelState:
         """그래프 실행 시뮬레이션"""
         state = dict(initial_state)
-        current_node = self.entry_point
+        state["execution_log"] = list(state.get("execution_log", []))
+        step = self._entry_step
 
-        while current_node:
-            # 노드 실행
-            if current_node in self.nodes:
-                result = self.nodes[current_node](state)
+        while step is not None:
+            node_func, router_func, routes, next_step = step
+
+            # 노드 실행 - execution_log는 덮어쓰지 않고 이어 붙인다 (reducer 시뮬레이션)
+            # MUTATE 모드의 노드는 state를 직접 고치고 None을 반환하므로 병합할 것이 없다
+            result = node_func(state) if node_func is not None else None
+            if result:
+                log_delta = result.pop("execution_log", None)
                 state.update(result)
+                if log_delta:
+                    state["execution_log"].extend(log_delta)
 
-            # 다음 노드 결정
-            if current_node in self.conditional_edges:
-                router_func, route_map = self.conditional_edges[current_node]
-                route_key = router_func(state)
-                current_node = route_map.get(route_key)
-            elif current_node in self.edges:
-                current_node = self.edges[current_node]
-            else:
-                current_node = None
+            # 다음 노드 결정 (미리 연결된 step)
+            step = routes.get(router_func(state)) if router_func else next_step
 
         return state
 
@@ -501,20 +700,60 @@ def build_travel_graph():
         return MockCompiledGraph(nodes, edges, conditional_edges, "parse_request")
 
 
+# ============================================================
+# Plan cache - 같은 요청이면 그래프를 다시 실행하지 않는다
+# ============================================================
+
+_PLAN_CACHE: Dict[str, TravelState] = {}
+
+
+def _normalize_request(user_request: str) -> str:
+    """
+    캐시 키용 요청 정규화
+
+    공백/대소문자 차이를 없애고, 순서가 의미 없는 '-' 항목은 정렬한다.
+    """
+    lines = [line.strip().lower() for line in user_request.splitlines() if line.strip()]
+    header = [line for line in lines if not line.startswith("-")]
+    bullets = sorted(" ".join(line[1:].split()) for line in lines if line.startswith("-"))
+    return "\n".join([" ".join(line.split()) for line in header] + bullets)
+
+
+def plan_cache_key(user_request: str) -> str:
+    """정규화된 요청의 blake2b 해시"""
+    return hashlib.blake2b(_normalize_request(user_request).encode(), digest_size=16).hexdigest()
+
+
+def _copy_state(state: TravelState) -> TravelState:
+    """캐시와 호출자가 같은 객체를 공유하지 않도록 복사 (list 필드까지)"""
+    return {k: list(v) if isinstance(v, list) else v for k, v in state.items()}
+
+
+def invoke_with_plan_cache(app, initial_state: TravelState) -> TravelState:
+    """app.invoke 결과를 정규화된 raw_request 기준으로 캐시"""
+    key = plan_cache_key(initial_state["raw_request"])
+    cached = _PLAN_CACHE.get(key)
+    if cached is not None:
+        return _copy_state(cached)
+    final_state = app.invoke(initial_state)
+    _PLAN_CACHE[key] = _copy_state(final_state)
+    return final_state
+
+
 # ============================================================
 # 실행
 # ============================================================
 
 def main():
-    print("=" * 60)
-    print("LangGraph 여행 일정 생성기")
-    print("=" * 60)
-    print()
-    print("이 샘플이 보여주는 것:")
-    print("  - 에이전트의 사고 흐름이 명시적인 State/Node로 나뉘어 있다")
-    print("  - 실행 순서가 '그래프'로 고정되어 있다")
-    print("  - 조건 분기가 그래프 엣지로 표현된다")
-    print()
+    _emit("=" * 60)
+    _emit("LangGraph 여행 일정 생성기")
+    _emit("=" * 60)
+    _emit()
+    _emit("이 샘플이 보여주는 것:")
+    _emit("  - 에이전트의 사고 흐름이 명시적인 State/Node로 나뉘어 있다")
+    _emit("  - 실행 순서가 '그래프'로 고정되어 있다")
+    _emit("  - 조건 분기가 그래프 엣지로 표현된다")
+    _emit()
 
     # 그래프 구성
     app = build_travel_graph()
@@ -526,14 +765,14 @@ def main():
 - 혼밥 가능
 - 이동 동선 최소화"""
 
-    print("📝 사용자 요청:")
-    print("-" * 40)
-    print(user_request)
-    print()
+    _emit("📝 사용자 요청:")
+    _emit("-" * 40)
+    _emit(user_request)
+    _emit()
 
     # 그래프 실행
-    print("🔄 그래프 실행 로그:")
-    print("-" * 40)
+    _emit("🔄 그래프 실행 로그:")
+    _emit("-" * 40)
 
     initial_state: TravelState = {
         "raw_request": user_request,
@@ -550,16 +789,16 @@ def main():
         "execution_log": []
     }
 
-    # invoke로 전체 그래프 실행
-    final_state = app.invoke(initial_state)
+    # invoke로 전체 그래프 실행 (같은 요청은 plan cache에서 재사용)
+    final_state = invoke_with_plan_cache(app, initial_state)
 
     # 실행 로그 출력
     for log_line in final_state["execution_log"]:
-        print(log_line)
+        _emit(log_line)
 
-    print()
-    print("🎯 최종 결과:")
-    print(final_state["final_output"])
+    _emit()
+    _emit("🎯 최종 결과:")
+    _emit(final_state["final_output"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+"""
+LangGraph 샘플 AOT 컴파일 (선택)
+================================
+
+main.py를 Cython으로 컴파일해 그래프 실행 루프와 노드 호출의
+인터프리터 오버헤드를 줄인다.
+
+빌드:
+    pip install cython
+    python setup.py build_ext --inplace
+
+빌드하면 같은 디렉터리에 main.*.so가 생기고, `import main`은 .py보다
+확장 모듈을 먼저 로드한다. 빌드하지 않으면 main.py가 그대로 쓰인다.
+
+실행 (컴파일된 모듈):
+    python -c "import main; main.main()"
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="langgraph-travel-sample",
+    ext_modules=cythonize(
+        "main.py",
+        build_dir="build",
+        compiler_directives={"language_level": "3", "infer_types": True},
+    ),
+)